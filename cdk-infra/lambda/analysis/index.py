@@ -1,31 +1,179 @@
+import os
 import json
+import math
+import time
+from collections import OrderedDict, namedtuple
+from concurrent.futures import ThreadPoolExecutor
 import boto3
-import pandas as pd
+from boto3.dynamodb.conditions import Key, Attr
 import numpy as np
 from decimal import Decimal
 from datetime import datetime, timedelta
+from functools import lru_cache
+from operator import itemgetter
+from types import MappingProxyType
 
-# Initialize DynamoDB client
-dynamodb = boto3.resource('dynamodb')
+# orjson serializes large time-series responses much faster than the stdlib encoder
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# Response headers shared by every invocation
+CORS_HEADERS = {
+    'Access-Control-Allow-Origin': '*',
+    'Access-Control-Allow-Headers': 'Content-Type,X-Amz-Date,Authorization,X-Api-Key,X-Amz-Security-Token',
+    'Access-Control-Allow-Methods': 'GET,OPTIONS',
+    'Access-Control-Allow-Credentials': 'true'
+}
+JSON_RESPONSE_HEADERS = {'Content-Type': 'application/json', **CORS_HEADERS}
+
+# Number of calendar days covered by each supported analysis period
+PERIOD_DAYS = {
+    '1w': 7,
+    '1m': 30,
+    '3m': 90,
+    '6m': 180,
+    '1y': 365,
+    '3y': 365 * 3,
+    '5y': 365 * 5
+}
+
+# Position columns extracted once per request, plus per-position values and category codes
+PositionArrays = namedtuple('PositionArrays', [
+    'tickers', 'shares', 'purchase_prices', 'current_prices', 'values', 'sector_codes', 'asset_class_codes'
+])
+
+# A time series in column form: 'YYYY-MM-DD' date strings and a float64 array of values
+PerformanceSeries = namedtuple('PerformanceSeries', ['dates', 'values'])
+
+# Initialize DynamoDB clients. The portfolio lookup and the positions query run concurrently,
+# and every call through a resource resets that resource's shared condition-expression
+# builder, so each table gets its own resource (and underlying client).
+portfolio_dynamodb = boto3.resource('dynamodb')
+position_dynamodb = boto3.resource('dynamodb')
+
+# Table handles are created once per container and reused by warm invocations
+portfolio_table = portfolio_dynamodb.Table(os.environ['PORTFOLIO_TABLE']) if os.environ.get('PORTFOLIO_TABLE') else None
+position_table = position_dynamodb.Table(os.environ['POSITION_TABLE']) if os.environ.get('POSITION_TABLE') else None
+
+# Worker threads for overlapping independent DynamoDB requests within one invocation
+dynamodb_executor = ThreadPoolExecutor(max_workers=2)
+
+# Unseeded generator for estimating missing current prices (avoids the global NumPy RNG)
+price_estimate_rng = np.random.default_rng()
+
+# Positions cached per (user_id, portfolio_id) across warm invocations of this container
+POSITIONS_CACHE_TTL_SECONDS = 30
+POSITIONS_CACHE_MAX_ENTRIES = 128
+_positions_cache = OrderedDict()
+
+# Position attributes read by the analysis endpoints, plus the owner for the client-side check
+# (aliased to avoid DynamoDB reserved words)
+POSITION_ATTRIBUTES = ('userId', 'ticker', 'shares', 'purchasePrice', 'currentPrice', 'purchaseDate')
+POSITION_PROJECTION = ', '.join(f'#{name}' for name in POSITION_ATTRIBUTES)
+POSITION_ATTRIBUTE_NAMES = {f'#{name}': name for name in POSITION_ATTRIBUTES}
+
+# Mock sector mapping, built once per container (read-only)
+# In a real implementation, you would look up the sector for each ticker
+SECTOR_MAPPING = MappingProxyType({
+    'AAPL': 'Technology',
+    'MSFT': 'Technology',
+    'GOOGL': 'Technology',
+    'AMZN': 'Consumer Cyclical',
+    'FB': 'Technology',
+    'TSLA': 'Automotive',
+    'JPM': 'Financial Services',
+    'V': 'Financial Services',
+    'JNJ': 'Healthcare',
+    'WMT': 'Consumer Defensive',
+    'PG': 'Consumer Defensive',
+    'XOM': 'Energy',
+    'BAC': 'Financial Services',
+    'HD': 'Consumer Cyclical',
+    'INTC': 'Technology',
+    'VZ': 'Communication Services',
+    'T': 'Communication Services',
+    'NFLX': 'Communication Services',
+    'CSCO': 'Technology',
+    'PFE': 'Healthcare'
+})
+
+# Mock asset class mapping, built once per container (read-only)
+# In a real implementation, you would look up the asset class for each ticker
+ASSET_CLASS_MAPPING = MappingProxyType({
+    'AAPL': 'Stocks',
+    'MSFT': 'Stocks',
+    'GOOGL': 'Stocks',
+    'AMZN': 'Stocks',
+    'FB': 'Stocks',
+    'TSLA': 'Stocks',
+    'JPM': 'Stocks',
+    'V': 'Stocks',
+    'JNJ': 'Stocks',
+    'WMT': 'Stocks',
+    'PG': 'Stocks',
+    'XOM': 'Stocks',
+    'BAC': 'Stocks',
+    'HD': 'Stocks',
+    'INTC': 'Stocks',
+    'VZ': 'Stocks',
+    'T': 'Stocks',
+    'NFLX': 'Stocks',
+    'CSCO': 'Stocks',
+    'PFE': 'Stocks',
+    'AGG': 'Bonds',
+    'BND': 'Bonds',
+    'LQD': 'Bonds',
+    'TLT': 'Bonds',
+    'SHY': 'Bonds',
+    'GLD': 'Commodities',
+    'SLV': 'Commodities',
+    'VNQ': 'Real Estate'
+})
+
+def _category_codes(mapping, default_category):
+    """Map tickers to integer category codes; returns (category names, ticker codes, default code)"""
+    names = list(dict.fromkeys(mapping.values()))
+    if default_category not in names:
+        names.append(default_category)
+    index = {name: code for code, name in enumerate(names)}
+    
+    return names, {ticker: index[category] for ticker, category in mapping.items()}, index[default_category]
+
+# Categorical codes are built once per container; unknown tickers fall into 'Other'
+SECTOR_NAMES, SECTOR_CODES, OTHER_SECTOR_CODE = _category_codes(SECTOR_MAPPING, 'Other')
+ASSET_CLASS_NAMES, ASSET_CLASS_CODES, OTHER_ASSET_CLASS_CODE = _category_codes(ASSET_CLASS_MAPPING, 'Other')
 
 def decimal_default(obj):
-    """Convert Decimal objects to float for JSON serialization"""
+    """Convert Decimal objects (and NumPy values for the stdlib encoder) for JSON serialization"""
     if isinstance(obj, Decimal):
         return float(obj)
+    if isinstance(obj, (np.ndarray, np.generic)):
+        return obj.tolist()
     raise TypeError("Type not serializable")
 
+def _dumps(obj):
+    """Serialize a response body to a JSON string, using orjson when available
+    
+    orjson encodes NumPy scalars and C-contiguous arrays natively; anything else
+    (Decimal, strided array views) goes through decimal_default.
+    """
+    if orjson is not None:
+        return orjson.dumps(
+            obj,
+            default=decimal_default,
+            option=orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS
+        ).decode()
+    return json.dumps(obj, default=decimal_default, separators=(',', ':'))
+
 def lambda_handler(event, context):
     """Main handler for portfolio analysis requests"""
     # Handle OPTIONS requests (preflight)
     if event.get('httpMethod') == 'OPTIONS':
         return {
             'statusCode': 200,
-            'headers': {
-                'Access-Control-Allow-Origin': '*',
-                'Access-Control-Allow-Headers': 'Content-Type,X-Amz-Date,Authorization,X-Api-Key,X-Amz-Security-Token',
-                'Access-Control-Allow-Methods': 'GET,OPTIONS',
-                'Access-Control-Allow-Credentials': 'true'
-            },
+            'headers': CORS_HEADERS,
             'body': ''
         }
     try:        
@@ -45,7 +193,6 @@ def lambda_handler(event, context):
         if not user_id:
             user_id = auth_context.get('sub')
 
-
              # Option 3: Check if claims is a string and parse it
         if not user_id and 'claims' in auth_context and isinstance(auth_context['claims'], str):
             try:
@@ -71,7 +218,7 @@ def lambda_handler(event, context):
                     'Access-Control-Allow-Headers': 'Content-Type,Authorization',
                     'Access-Control-Allow-Methods': 'OPTIONS,GET,POST'
                 },
-                'body': json.dumps({'error': 'User not authenticated'})
+                'body': _dumps({'error': 'User not authenticated'})
             }
         
         # Handle different types of analysis
@@ -96,11 +243,16 @@ def lambda_handler(event, context):
         return create_response(500, {'error': f'Failed to process request: {str(e)}'})
 
 def portfolio_performance_analysis(user_id, query_params):
-    """Calculate portfolio performance metrics"""
+    """Calculate portfolio performance metrics
+    
+    With columnar=true the time series is returned as parallel arrays
+    ({"date": [...], "value": [...]}) instead of a list of row objects.
+    """
     try:
         # Get portfolio ID from query parameters or use default
         portfolio_id = query_params.get('portfolioId', 'default')
         period = query_params.get('period', '1m')  # Default to 1 month
+        columnar = _is_columnar(query_params)
         
         # Get portfolio positions
         positions = get_portfolio_positions(user_id, portfolio_id)
@@ -111,36 +263,22 @@ def portfolio_performance_analysis(user_id, query_params):
         # Calculate time period for analysis
         end_date = datetime.now()
         
-        if period == '1w':
-            start_date = end_date - timedelta(days=7)
-        elif period == '1m':
-            start_date = end_date - timedelta(days=30)
-        elif period == '3m':
-            start_date = end_date - timedelta(days=90)
-        elif period == '6m':
-            start_date = end_date - timedelta(days=180)
-        elif period == '1y':
-            start_date = end_date - timedelta(days=365)
-        elif period == '5y':
-            start_date = end_date - timedelta(days=365*5)
-        else:
-            start_date = end_date - timedelta(days=30)  # Default to 1 month
+        start_date = end_date - timedelta(days=PERIOD_DAYS.get(period, 30))  # Default to 1 month
         
         # For this demo, we'll generate some mock performance data
         # In a real-world scenario, you would fetch historical price data from a financial API
-        performance_data = generate_mock_performance_data(positions, start_date, end_date)
+        performance = _mock_performance_series(positions, start_date, end_date)
         
         # Calculate performance metrics
-        total_initial_value = sum(position['purchasePrice'] * position['shares'] for position in positions)
-        total_current_value = sum(position['currentPrice'] * position['shares'] for position in positions)
+        position_arrays = _vectorize_positions(positions)
+        total_initial_value = float(position_arrays.shares @ position_arrays.purchase_prices)
+        total_current_value = float(position_arrays.values.sum())
         
         absolute_return = total_current_value - total_initial_value
         percentage_return = (absolute_return / total_initial_value) * 100 if total_initial_value > 0 else 0
         
-        # Calculate additional statistics
-        max_drawdown = calculate_max_drawdown(performance_data)
-        volatility = calculate_volatility(performance_data)
-        sharpe_ratio = calculate_sharpe_ratio(performance_data)
+        # Calculate additional statistics in a single pass over the value series
+        max_drawdown, volatility, sharpe_ratio = _compute_metrics(performance.values)
         
         return create_response(200, {
             'portfolioPerformance': {
@@ -151,7 +289,7 @@ def portfolio_performance_analysis(user_id, query_params):
                 'maxDrawdown': max_drawdown,
                 'volatility': volatility,
                 'sharpeRatio': sharpe_ratio,
-                'timeSeries': performance_data
+                'timeSeries': _series_payload(performance.dates, {'value': performance.values}, columnar)
             }
         })
         
@@ -160,8 +298,13 @@ def portfolio_performance_analysis(user_id, query_params):
         return create_response(500, {'error': f'Failed to analyze portfolio performance: {str(e)}'})
 
 def technical_indicators(user_id, query_params):
-    """Calculate technical indicators for a stock"""
+    """Calculate technical indicators for a stock
+    
+    With columnar=true each indicator is returned as parallel arrays keyed by
+    field name (e.g. {"date": [...], "sma": [...]}) instead of a list of row objects.
+    """
     try:
+        columnar = _is_columnar(query_params)
         ticker = query_params.get('ticker')
         if not ticker:
             return create_response(400, {'error': 'Ticker symbol is required'})
@@ -171,11 +314,11 @@ def technical_indicators(user_id, query_params):
         
         # Calculate technical indicators
         indicators = {
-            'sma': calculate_sma(price_data, 20),  # 20-day Simple Moving Average
-            'ema': calculate_ema(price_data, 20),  # 20-day Exponential Moving Average
-            'rsi': calculate_rsi(price_data, 14),  # 14-day Relative Strength Index
-            'macd': calculate_macd(price_data),    # Moving Average Convergence Divergence
-            'bollinger': calculate_bollinger_bands(price_data, 20)  # 20-day Bollinger Bands
+            'sma': calculate_sma(price_data, 20, columnar),  # 20-day Simple Moving Average
+            'ema': calculate_ema(price_data, 20, columnar),  # 20-day Exponential Moving Average
+            'rsi': calculate_rsi(price_data, 14, columnar),  # 14-day Relative Strength Index
+            'macd': calculate_macd(price_data, columnar),    # Moving Average Convergence Divergence
+            'bollinger': calculate_bollinger_bands(price_data, 20, columnar)  # 20-day Bollinger Bands
         }
         
         return create_response(200, {
@@ -202,11 +345,14 @@ def risk_analysis(user_id, query_params):
         # For demo purposes, generate mock correlation data and other risk metrics
         correlations = generate_mock_correlations(positions)
         
+        # Extract position columns once for the beta and VaR calculations
+        position_arrays = _vectorize_positions(positions)
+        
         # Calculate portfolio beta (market sensitivity)
-        portfolio_beta = calculate_portfolio_beta(positions)
+        portfolio_beta = calculate_portfolio_beta(position_arrays)
         
         # Calculate Value at Risk (VaR)
-        value_at_risk = calculate_value_at_risk(positions)
+        value_at_risk = calculate_value_at_risk(position_arrays)
         
         return create_response(200, {
             'riskAnalysis': {
@@ -226,12 +372,17 @@ def risk_analysis(user_id, query_params):
         return create_response(500, {'error': f'Failed to perform risk analysis: {str(e)}'})
 
 def benchmark_comparison(user_id, query_params):
-    """Compare portfolio performance against benchmarks"""
+    """Compare portfolio performance against benchmarks
+    
+    With columnar=true both time series are returned as parallel arrays
+    ({"date": [...], "value": [...]}) instead of lists of row objects.
+    """
     try:
         # Get portfolio ID from query parameters or use default
         portfolio_id = query_params.get('portfolioId', 'default')
         benchmark = query_params.get('benchmark', 'SPY')  # Default to S&P 500 ETF
         period = query_params.get('period', '1y')  # Default to 1 year
+        columnar = _is_columnar(query_params)
         
         # Get portfolio positions
         positions = get_portfolio_positions(user_id, portfolio_id)
@@ -242,31 +393,21 @@ def benchmark_comparison(user_id, query_params):
         # Calculate time period for comparison
         end_date = datetime.now()
         
-        if period == '1m':
-            start_date = end_date - timedelta(days=30)
-        elif period == '3m':
-            start_date = end_date - timedelta(days=90)
-        elif period == '6m':
-            start_date = end_date - timedelta(days=180)
-        elif period == '1y':
-            start_date = end_date - timedelta(days=365)
-        elif period == '3y':
-            start_date = end_date - timedelta(days=365*3)
-        elif period == '5y':
-            start_date = end_date - timedelta(days=365*5)
-        else:
-            start_date = end_date - timedelta(days=365)  # Default to 1 year
+        start_date = end_date - timedelta(days=PERIOD_DAYS.get(period, 365))  # Default to 1 year
         
         # Generate mock performance data for both portfolio and benchmark
-        portfolio_performance = generate_mock_performance_data(positions, start_date, end_date)
-        benchmark_performance = generate_mock_benchmark_data(benchmark, start_date, end_date)
+        # Both series cover the same date range, so build the date strings once
+        dates = _date_strings(start_date, (end_date - start_date).days + 1)
+        portfolio_performance = _mock_performance_series(positions, start_date, end_date, dates)
+        benchmark_performance = _mock_benchmark_series(benchmark, start_date, end_date, dates)
         
         # Calculate performance metrics for comparison
         portfolio_return = calculate_period_return(portfolio_performance)
         benchmark_return = calculate_period_return(benchmark_performance)
         
         tracking_error = calculate_tracking_error(portfolio_performance, benchmark_performance)
-        information_ratio = calculate_information_ratio(portfolio_performance, benchmark_performance)
+        # Reuse the returns and tracking error computed above
+        information_ratio = _information_ratio(portfolio_return - benchmark_return, tracking_error)
         
         return create_response(200, {
             'benchmarkComparison': {
@@ -277,8 +418,8 @@ def benchmark_comparison(user_id, query_params):
                 'trackingError': tracking_error,
                 'informationRatio': information_ratio,
                 'alpha': portfolio_return - benchmark_return,  # Simple alpha calculation
-                'portfolioTimeSeries': portfolio_performance,
-                'benchmarkTimeSeries': benchmark_performance
+                'portfolioTimeSeries': _series_payload(dates, {'value': portfolio_performance.values}, columnar),
+                'benchmarkTimeSeries': _series_payload(dates, {'value': benchmark_performance.values}, columnar)
             }
         })
         
@@ -299,16 +440,18 @@ def diversification_analysis(user_id, query_params):
             return create_response(404, {'error': 'No positions found'})
         
         # Calculate total portfolio value
-        total_value = sum(position['currentPrice'] * position['shares'] for position in positions)
+        # Vectorize the positions once and share the arrays across all metrics
+        position_arrays = _vectorize_positions(positions)
+        total_value = float(position_arrays.values.sum())
         
         # Analyze sector allocation (using mock sector data for this example)
-        sector_allocation = analyze_sector_allocation(positions, total_value)
+        sector_allocation = analyze_sector_allocation(position_arrays, total_value)
         
         # Analyze allocation by asset class
-        asset_class_allocation = analyze_asset_class_allocation(positions, total_value)
+        asset_class_allocation = analyze_asset_class_allocation(position_arrays, total_value)
         
         # Calculate concentration metrics
-        concentration = calculate_concentration(positions, total_value)
+        concentration = calculate_concentration(position_arrays, total_value)
         
         return create_response(200, {
             'diversificationAnalysis': {
@@ -326,20 +469,69 @@ def diversification_analysis(user_id, query_params):
 # Helper functions for calculations
 
 def get_portfolio_positions(user_id, portfolio_id):
+    """Retrieve portfolio positions, reusing a recent result from this container when available"""
+    # Development relies on mock fallbacks, so always read through
+    if os.environ.get('ENVIRONMENT') == 'development':
+        return _fetch_portfolio_positions(user_id, portfolio_id)
+    
+    key = (user_id, portfolio_id)
+    now = time.monotonic()
+    cached = _positions_cache.get(key)
+    if cached is not None and now - cached[0] < POSITIONS_CACHE_TTL_SECONDS:
+        _positions_cache.move_to_end(key)
+        return cached[1]
+    
+    positions = _fetch_portfolio_positions(user_id, portfolio_id)
+    
+    # Don't cache misses so a newly created portfolio shows up immediately
+    if positions:
+        _positions_cache[key] = (now, positions)
+        _positions_cache.move_to_end(key)
+        while len(_positions_cache) > POSITIONS_CACHE_MAX_ENTRIES:
+            _positions_cache.popitem(last=False)
+    else:
+        _positions_cache.pop(key, None)
+    
+    return positions
+
+def invalidate_portfolio_positions(user_id=None, portfolio_id=None):
+    """Drop cached positions for one portfolio, or all cached positions when no key is given"""
+    if user_id is None and portfolio_id is None:
+        _positions_cache.clear()
+    else:
+        _positions_cache.pop((user_id, portfolio_id), None)
+
+def _fetch_portfolio_positions(user_id, portfolio_id):
     """Retrieve portfolio positions from DynamoDB"""
     try:
-        # Get the portfolio table and position table
-        portfolio_table = dynamodb.Table(os.environ['PORTFOLIO_TABLE'])
-        position_table = dynamodb.Table(os.environ['POSITION_TABLE'])
+        if portfolio_table is None or position_table is None:
+            raise RuntimeError('PORTFOLIO_TABLE and POSITION_TABLE must be configured')
         
-        # First verify the portfolio belongs to the user
-        portfolio_response = portfolio_table.get_item(
+        # Verify the portfolio belongs to the user and fetch its positions concurrently.
+        # This relies on the two tables coming from separate boto3 resources: calls through
+        # one resource share a condition-expression builder that every call resets, so a
+        # get_item on the same client could clobber the query's FilterExpression.
+        portfolio_future = dynamodb_executor.submit(
+            portfolio_table.get_item,
             Key={
                 'userId': user_id,
                 'portfolioId': portfolio_id
             }
         )
         
+        # For security, DynamoDB only returns positions that belong to the requesting user
+        position_future = dynamodb_executor.submit(
+            position_table.query,
+            KeyConditionExpression=Key('portfolioId').eq(portfolio_id),
+            FilterExpression=Attr('userId').eq(user_id),
+            ProjectionExpression=POSITION_PROJECTION,
+            ExpressionAttributeNames=POSITION_ATTRIBUTE_NAMES
+        )
+        
+        portfolio_response = portfolio_future.result()
+        position_response = position_future.result()
+        
+        # Positions are discarded unless the ownership check passes
         if 'Item' not in portfolio_response:
             print(f"Portfolio not found or does not belong to user: {user_id}, {portfolio_id}")
             # If portfolio not found, check if it's a development environment
@@ -348,15 +540,8 @@ def get_portfolio_positions(user_id, portfolio_id):
                 return get_mock_positions()
             return []
         
-        # Get positions for the portfolio
-        position_response = position_table.query(
-            KeyConditionExpression=boto3.dynamodb.conditions.Key('portfolioId').eq(portfolio_id)
-        )
-        
-        positions = position_response.get('Items', [])
-        
-        # For security, verify each position belongs to the correct user
-        filtered_positions = [p for p in positions if p.get('userId') == user_id]
+        # For security, verify each position belongs to the correct user as well
+        filtered_positions = [p for p in position_response.get('Items', []) if p.get('userId') == user_id]
         
         # If no positions found and it's development environment, return mock data
         if not filtered_positions and os.environ.get('ENVIRONMENT') == 'development':
@@ -365,12 +550,18 @@ def get_portfolio_positions(user_id, portfolio_id):
         
         # Ensure all positions have currentPrice if not already present
         # This would be updated with real-time price data in production
-        for position in filtered_positions:
-            if 'currentPrice' not in position:
-                # In production, this would call a stock price API
-                # For now, estimate current price with a small random increase
-                purchase_price = float(position.get('purchasePrice', 100))
-                position['currentPrice'] = purchase_price * (1 + (np.random.random() * 0.2 - 0.05))
+        missing_price = [position for position in filtered_positions if 'currentPrice' not in position]
+        if missing_price:
+            # In production, this would call a stock price API
+            # For now, estimate current prices with a small random increase, drawn in one batch
+            purchase_prices = np.fromiter(
+                (float(position.get('purchasePrice', 100)) for position in missing_price),
+                dtype=np.float64,
+                count=len(missing_price)
+            )
+            estimated_prices = purchase_prices * (1 + (price_estimate_rng.random(len(missing_price)) * 0.2 - 0.05))
+            for position, price in zip(missing_price, estimated_prices.tolist()):
+                position['currentPrice'] = price
         
         return filtered_positions
         
@@ -383,6 +574,33 @@ def get_portfolio_positions(user_id, portfolio_id):
         # In production, propagate the error
         raise
 
+def _vectorize_positions(positions):
+    """Convert a list of position dicts into PositionArrays in a single pass"""
+    count = len(positions)
+    tickers = [p['ticker'] for p in positions]
+    shares = np.fromiter((float(p['shares']) for p in positions), dtype=np.float64, count=count)
+    # purchasePrice is optional on stored positions; default it as the current-price estimate does
+    purchase_prices = np.fromiter(
+        (float(p.get('purchasePrice', 100)) for p in positions), dtype=np.float64, count=count
+    )
+    current_prices = np.fromiter((float(p['currentPrice']) for p in positions), dtype=np.float64, count=count)
+    sector_codes = np.fromiter(
+        (SECTOR_CODES.get(ticker, OTHER_SECTOR_CODE) for ticker in tickers), dtype=np.intp, count=count
+    )
+    asset_class_codes = np.fromiter(
+        (ASSET_CLASS_CODES.get(ticker, OTHER_ASSET_CLASS_CODE) for ticker in tickers), dtype=np.intp, count=count
+    )
+    
+    return PositionArrays(
+        tickers=tickers,
+        shares=shares,
+        purchase_prices=purchase_prices,
+        current_prices=current_prices,
+        values=shares * current_prices,
+        sector_codes=sector_codes,
+        asset_class_codes=asset_class_codes
+    )
+
 def get_mock_positions():
     """Return mock positions for demonstration or fallback"""
     return [
@@ -416,30 +634,47 @@ def get_mock_positions():
         }
     ]
 
-def generate_mock_performance_data(positions, start_date, end_date):
-    """Generate mock performance data for demonstration purposes"""
+def _is_columnar(query_params):
+    """Whether the caller asked for time series as parallel arrays"""
+    return str(query_params.get('columnar', '')).lower() in ('1', 'true')
+
+def _series_payload(dates, columns, columnar=False):
+    """Format aligned series as a list of row dicts, or as parallel arrays when columnar"""
+    if columnar:
+        return {'date': list(dates), **columns}
+    
+    keys = ('date',) + tuple(columns)
+    values = [np.asarray(column).tolist() for column in columns.values()]
+    return [dict(zip(keys, row)) for row in zip(dates, *values)]
+
+def _date_strings(start_date, count):
+    """Consecutive daily 'YYYY-MM-DD' strings starting at start_date"""
+    first_day = np.datetime64(start_date.date(), 'D')
+    return np.arange(first_day, first_day + count).astype(str).tolist()
+
+def _mock_performance_series(positions, start_date, end_date, dates=None):
+    """Generate mock portfolio values as a PerformanceSeries"""
     # In a real implementation, you would fetch historical price data from a financial API
     
     # Calculate number of days in the date range
     days = (end_date - start_date).days
     
     # Generate a series of dates
-    dates = [(start_date + timedelta(days=i)).strftime('%Y-%m-%d') for i in range(days + 1)]
+    if dates is None:
+        dates = _date_strings(start_date, days + 1)
     
     # Generate portfolio values with some random fluctuation around a trend
-    base_value = sum(position['shares'] * position['purchasePrice'] for position in positions)
+    # Coerce to float up front so DynamoDB Decimals never reach the arithmetic
+    base_value = math.fsum(float(position['shares']) * float(position['purchasePrice']) for position in positions)
     
     # Create a smooth trend with some randomness
-    np.random.seed(42)  # For reproducibility
+    rng = np.random.default_rng(42)  # For reproducibility
     trend_factor = np.linspace(0, 0.15, days + 1)  # Trending upward by 15% over the period
-    random_factor = np.random.normal(0, 0.01, days + 1)  # Daily random fluctuations
+    random_factor = rng.normal(0, 0.01, days + 1)  # Daily random fluctuations
     
-    daily_values = [base_value * (1 + trend + random) for trend, random in zip(trend_factor, random_factor)]
+    daily_values = base_value * (1.0 + trend_factor + random_factor)
     
-    # Combine dates and values
-    performance_data = [{"date": date, "value": value} for date, value in zip(dates, daily_values)]
-    
-    return performance_data
+    return PerformanceSeries(dates, daily_values)
 
 def generate_mock_price_data(ticker):
     """Generate mock price data for a stock"""
@@ -450,11 +685,11 @@ def generate_mock_price_data(ticker):
     start_date = end_date - timedelta(days=100)
     
     # Generate dates
-    dates = [(start_date + timedelta(days=i)).strftime('%Y-%m-%d') for i in range(101)]
+    dates = _date_strings(start_date, 101)
     
     # Generate prices with trend and randomness based on ticker hash
     ticker_value = sum(ord(c) for c in ticker)
-    np.random.seed(ticker_value)  # Different seed for different tickers
+    rng = np.random.default_rng(ticker_value)  # Different seed for different tickers
     
     # Starting price between 50 and 500
     start_price = 50 + (ticker_value % 450)
@@ -465,90 +700,117 @@ def generate_mock_price_data(ticker):
     trend_factor = np.linspace(0, trend_direction * trend_magnitude, 101)
     
     # Random daily fluctuations
-    random_factor = np.random.normal(0, 0.015, 101)
+    random_factor = rng.normal(0, 0.015, 101)
     
     # Calculate daily prices
-    prices = [start_price * (1 + trend + random) for trend, random in zip(trend_factor, random_factor)]
+    prices = start_price * (1.0 + trend_factor + random_factor)
+    
+    # Derive open/high/low/volume from one batched draw per column
+    open_factor = 1.0 - rng.uniform(0.005, 0.015, prices.size)
+    high_factor = 1.0 + rng.uniform(0.005, 0.025, prices.size)
+    low_factor = 1.0 - rng.uniform(0.010, 0.030, prices.size)
+    volume = rng.uniform(1000000, 10000000, prices.size).astype(np.int64)
     
-    # Create dataframe
-    price_data = pd.DataFrame({
+    # Collect the OHLCV columns
+    price_data = {
         'date': dates,
         'close': prices,
-        'open': [price * (1 - np.random.uniform(0.005, 0.015)) for price in prices],
-        'high': [price * (1 + np.random.uniform(0.005, 0.025)) for price in prices],
-        'low': [price * (1 - np.random.uniform(0.010, 0.030)) for price in prices],
-        'volume': [int(np.random.uniform(1000000, 10000000)) for _ in prices]
-    })
+        'open': prices * open_factor,
+        'high': prices * high_factor,
+        'low': prices * low_factor,
+        'volume': volume
+    }
     
     return price_data
 
-def calculate_max_drawdown(performance_data):
-    """Calculate maximum drawdown from a series of portfolio values"""
-    values = [point['value'] for point in performance_data]
-    max_dd = 0
-    peak = values[0]
-    
-    for value in values:
-        if value > peak:
-            peak = value
-        drawdown = (peak - value) / peak
-        max_dd = max(max_dd, drawdown)
-    
-    return max_dd * 100  # Return as a percentage
+def _daily_returns(values):
+    """Simple daily returns of a float64 value array"""
+    return np.diff(values) / values[:-1]
 
-def calculate_volatility(performance_data):
-    """Calculate volatility (standard deviation of returns)"""
-    values = [point['value'] for point in performance_data]
-    daily_returns = [(values[i] / values[i-1]) - 1 for i in range(1, len(values))]
-    
-    return np.std(daily_returns) * np.sqrt(252) * 100  # Annualized, as percentage
+def _compute_metrics(values):
+    """Calculate (max drawdown, volatility, Sharpe ratio) from one array of portfolio values"""
+    if values.size == 0:
+        return 0, 0, 0
 
-def calculate_sharpe_ratio(performance_data):
-    """Calculate Sharpe ratio (assuming risk-free rate of 2%)"""
-    values = [point['value'] for point in performance_data]
-    daily_returns = [(values[i] / values[i-1]) - 1 for i in range(1, len(values))]
-    
-    avg_return = np.mean(daily_returns)
-    std_return = np.std(daily_returns)
+    # Maximum drawdown: running peak up to each point, then drawdown relative to that peak
+    peaks = np.maximum.accumulate(values)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        drawdowns = np.where(peaks > 0, 1.0 - values / peaks, 0.0)
+    max_drawdown = max(float(drawdowns.max()), 0.0) * 100  # As a percentage
+
+    if values.size < 2:
+        return max_drawdown, 0, 0
+
+    # Volatility and Sharpe ratio share the same daily returns and standard deviation
+    daily_returns = _daily_returns(values)
+    avg_return = float(daily_returns.mean())
+    std_return = float(daily_returns.std())
     risk_free_daily = 0.02 / 252  # 2% annual risk-free rate converted to daily
-    
-    if std_return == 0:
-        return 0
-    
-    sharpe = (avg_return - risk_free_daily) / std_return * np.sqrt(252)
-    return sharpe
 
-def calculate_sma(price_data, period):
+    volatility = std_return * np.sqrt(252) * 100  # Annualized, as percentage
+    sharpe = 0 if std_return == 0 else (avg_return - risk_free_daily) / std_return * np.sqrt(252)
+
+    return max_drawdown, volatility, sharpe
+
+def calculate_sma(price_data, period, columnar=False):
     """Calculate Simple Moving Average"""
-    closes = price_data['close'].values
-    dates = price_data['date'].values[-period:]
+    closes = np.asarray(price_data['close'], dtype=np.float64)
+    dates = price_data['date'][-period:]
     
-    sma_values = []
-    for i in range(len(closes) - period + 1):
-        sma_values.append(np.mean(closes[i:i+period]))
+    # Window sums from the difference of a zero-padded cumulative sum
+    csum = np.concatenate(([0.0], np.cumsum(closes, dtype=np.float64)))
+    sma_values = (csum[period:] - csum[:-period]) / period
     
     # Return just the most recent values for display
-    return [{"date": date, "sma": value} for date, value in zip(dates, sma_values[-period:])]
+    return _series_payload(dates, {'sma': sma_values[-period:]}, columnar)
+
+def _ema(values, span):
+    """Exponential moving average seeded with the first value (pandas ewm with adjust=False)"""
+    alpha = 2.0 / (span + 1)
+    # The recurrence is sequential, so iterate over Python floats rather than NumPy scalars
+    values = np.asarray(values, dtype=np.float64).tolist()
+    if not values:
+        return np.empty(0)
+    
+    ema = [values[0]]  # Start with first price
+    for value in values[1:]:
+        ema.append(alpha * value + (1 - alpha) * ema[-1])
+    
+    return np.array(ema, dtype=np.float64)
 
-def calculate_ema(price_data, period):
+def calculate_ema(price_data, period, columnar=False):
     """Calculate Exponential Moving Average"""
-    closes = price_data['close'].values
-    dates = price_data['date'].values[-period:]
+    closes = np.asarray(price_data['close'], dtype=np.float64)
+    dates = price_data['date'][-period:]
     
     # Calculate EMA
-    multiplier = 2 / (period + 1)
-    ema = [closes[0]]  # Start with first price
-    
-    for i in range(1, len(closes)):
-        ema.append(closes[i] * multiplier + ema[i-1] * (1 - multiplier))
+    ema = _ema(closes, period)
     
     # Return just the most recent values
-    return [{"date": date, "ema": value} for date, value in zip(dates, ema[-period:])]
+    return _series_payload(dates, {'ema': ema[-period:]}, columnar)
 
-def calculate_rsi(price_data, period):
+def _wilder_rsi(gains, losses, period):
+    """Wilder-smoothed RSI values from arrays of daily gains and losses"""
+    # Initialize avg_gain and avg_loss with simple averages
+    avg_gain = float(gains[:period].mean())
+    avg_loss = float(losses[:period].mean())
+    
+    # An average loss of zero means RS is infinite, i.e. an RSI of 100
+    rsi_values = [100.0 if avg_loss == 0 else 100 - (100 / (1 + avg_gain / avg_loss))]
+    
+    # Calculate RSI using Wilder's smoothing method, iterating over Python floats
+    for gain, loss in zip(gains[period:].tolist(), losses[period:].tolist()):
+        avg_gain = (avg_gain * (period - 1) + gain) / period
+        avg_loss = (avg_loss * (period - 1) + loss) / period
+        
+        rsi_values.append(100.0 if avg_loss == 0 else 100 - (100 / (1 + avg_gain / avg_loss)))
+    
+    return np.array(rsi_values, dtype=np.float64)
+
+def calculate_rsi(price_data, period, columnar=False):
     """Calculate Relative Strength Index"""
-    closes = price_data['close'].values
-    dates = price_data['date'].values[-period:]
+    closes = np.asarray(price_data['close'], dtype=np.float64)
+    dates = price_data['date'][-period:]
     
     # Calculate daily price changes
     deltas = np.diff(closes)
@@ -557,89 +819,61 @@ def calculate_rsi(price_data, period):
     gains = np.clip(deltas, 0, float('inf'))
     losses = np.abs(np.clip(deltas, float('-inf'), 0))
     
-    # Initialize avg_gain and avg_loss with simple averages
-    avg_gain = np.mean(gains[:period])
-    avg_loss = np.mean(losses[:period])
-    
-    if avg_loss == 0:
-        first_rs = float('inf')
-    else:
-        first_rs = avg_gain / avg_loss
-    
-    rsi_values = [100 - (100 / (1 + first_rs))]
-    
-    # Calculate RSI using Wilder's smoothing method
-    for i in range(period, len(deltas)):
-        avg_gain = (avg_gain * (period - 1) + gains[i]) / period
-        avg_loss = (avg_loss * (period - 1) + losses[i]) / period
-        
-        if avg_loss == 0:
-            rs = float('inf')
-        else:
-            rs = avg_gain / avg_loss
-        
-        rsi_values.append(100 - (100 / (1 + rs)))
+    rsi_values = _wilder_rsi(gains, losses, period)
     
     # Return just the most recent values
-    return [{"date": date, "rsi": value} for date, value in zip(dates, rsi_values[-period:])]
+    return _series_payload(dates, {'rsi': rsi_values[-period:]}, columnar)
 
-def calculate_macd(price_data):
+def calculate_macd(price_data, columnar=False):
     """Calculate MACD (Moving Average Convergence Divergence)"""
-    closes = price_data['close'].values
-    dates = price_data['date'].values[-26:]  # Show last 26 days
+    closes = np.asarray(price_data['close'], dtype=np.float64)
+    dates = price_data['date'][-26:]  # Show last 26 days
     
     # Calculate 12-day and 26-day EMAs
-    ema12 = pd.Series(closes).ewm(span=12, adjust=False).mean().values
-    ema26 = pd.Series(closes).ewm(span=26, adjust=False).mean().values
+    ema12 = _ema(closes, 12)
+    ema26 = _ema(closes, 26)
     
     # Calculate MACD line
     macd_line = ema12 - ema26
     
     # Calculate signal line (9-day EMA of MACD line)
-    signal_line = pd.Series(macd_line).ewm(span=9, adjust=False).mean().values
+    signal_line = _ema(macd_line, 9)
     
     # Calculate histogram
     histogram = macd_line - signal_line
     
-    # Return just the most recent values
-    result = []
-    for i in range(-26, 0):
-        result.append({
-            "date": dates[i],
-            "macd": macd_line[i],
-            "signal": signal_line[i],
-            "histogram": histogram[i]
-        })
-    
-    return result
+    # Return just the most recent values, aligned on the tail of each series
+    return _series_payload(dates, {
+        'macd': macd_line[-26:],
+        'signal': signal_line[-26:],
+        'histogram': histogram[-26:]
+    }, columnar)
 
-def calculate_bollinger_bands(price_data, period):
+def calculate_bollinger_bands(price_data, period, columnar=False):
     """Calculate Bollinger Bands (SMA with standard deviation bands)"""
-    closes = price_data['close'].values
-    dates = price_data['date'].values[-period:]
-    
-    bollinger_values = []
-    for i in range(len(closes) - period + 1):
-        window = closes[i:i+period]
-        sma = np.mean(window)
-        std = np.std(window)
-        
-        bollinger_values.append({
-            "sma": sma,
-            "upper": sma + 2 * std,
-            "lower": sma - 2 * std
-        })
+    closes = np.asarray(price_data['close'], dtype=np.float64)
+    dates = price_data['date'][-period:]
+    
+    # Rolling mean and population variance from cumulative sums (Var = E[x^2] - E[x]^2).
+    # Shifting by the series mean first keeps the subtraction well conditioned.
+    offset = closes.mean()
+    shifted = closes - offset
+    csum = np.concatenate(([0.0], np.cumsum(shifted)))
+    csum_sq = np.concatenate(([0.0], np.cumsum(shifted * shifted)))
+    window_mean = (csum[period:] - csum[:-period]) / period
+    window_var = (csum_sq[period:] - csum_sq[:-period]) / period - window_mean * window_mean
+    
+    sma = window_mean + offset
+    std = np.sqrt(np.clip(window_var, 0, None))
+    upper = sma + 2 * std
+    lower = sma - 2 * std
     
     # Return just the most recent values
-    return [
-        {
-            "date": date,
-            "middle": values["sma"],
-            "upper": values["upper"],
-            "lower": values["lower"]
-        }
-        for date, values in zip(dates, bollinger_values[-period:])
-    ]
+    return _series_payload(dates, {
+        'middle': sma[-period:],
+        'upper': upper[-period:],
+        'lower': lower[-period:]
+    }, columnar)
 
 def generate_mock_correlations(positions):
     """Generate a mock correlation matrix between positions"""
@@ -647,43 +881,39 @@ def generate_mock_correlations(positions):
     n = len(tickers)
     
     # Seed based on tickers for reproducibility
-    np.random.seed(sum(ord(c) for c in ''.join(tickers)))
+    rng = np.random.default_rng(sum(ord(c) for c in ''.join(tickers)))
     
     # Generate a random correlation matrix
     # First create a random matrix
-    A = np.random.randn(n, n)
+    A = rng.standard_normal((n, n))
     # Make it symmetric
     A = (A + A.T) / 2
+    # Ensure off-diagonal values are between -0.9 and 0.9
+    np.clip(A, -0.9, 0.9, out=A)
     # Ensure diagonal is 1
     np.fill_diagonal(A, 1)
     
-    # Ensure values are between -1 and 1
-    for i in range(n):
-        for j in range(n):
-            if i != j:
-                A[i, j] = max(-0.9, min(0.9, A[i, j]))
-    
     # Format result
-    correlation_matrix = []
-    for i, ticker1 in enumerate(tickers):
-        row = []
-        for j, ticker2 in enumerate(tickers):
-            row.append({
+    correlations = A.tolist()
+    return [
+        [
+            {
                 "ticker1": ticker1,
                 "ticker2": ticker2,
-                "correlation": A[i, j]
-            })
-        correlation_matrix.append(row)
-    
-    return correlation_matrix
+                "correlation": correlation
+            }
+            for ticker2, correlation in zip(tickers, row)
+        ]
+        for ticker1, row in zip(tickers, correlations)
+    ]
 
-def calculate_portfolio_beta(positions):
+def calculate_portfolio_beta(position_arrays):
     """Calculate mock portfolio beta (market sensitivity)"""
     # In a real implementation, you'd calculate this using regression
     # against market returns
     
     # For this demo, assign random betas to stocks and calculate weighted average
-    np.random.seed(42)
+    rng = np.random.default_rng(42)
     stock_betas = {
         'AAPL': 1.2,
         'MSFT': 1.1,
@@ -691,27 +921,27 @@ def calculate_portfolio_beta(positions):
         'AMZN': 1.3,
     }
     
-    # For any stocks not in our predefined list, assign a random beta
-    for position in positions:
-        if position['ticker'] not in stock_betas:
-            stock_betas[position['ticker']] = np.random.uniform(0.8, 1.5)
+    tickers = position_arrays.tickers
+    
+    # For any stocks not in our predefined list, assign a random beta (one batched draw)
+    unknown_tickers = [ticker for ticker in dict.fromkeys(tickers) if ticker not in stock_betas]
+    if unknown_tickers:
+        stock_betas.update(zip(unknown_tickers, rng.uniform(0.8, 1.5, len(unknown_tickers)).tolist()))
     
     # Calculate total value and weighted beta
-    total_value = sum(position['shares'] * position['currentPrice'] for position in positions)
-    weighted_beta = sum(
-        position['shares'] * position['currentPrice'] * stock_betas.get(position['ticker'], 1.0)
-        for position in positions
-    ) / total_value
+    position_values = position_arrays.values
+    betas = np.array([stock_betas.get(ticker, 1.0) for ticker in tickers], dtype=np.float64)
+    weighted_beta = float(position_values @ betas) / float(position_values.sum())
     
     return weighted_beta
 
-def calculate_value_at_risk(positions):
+def calculate_value_at_risk(position_arrays):
     """Calculate Value at Risk (VaR) at 95% confidence level"""
     # In a real implementation, you'd use historical returns or Monte Carlo simulation
     # For this demo, we'll use a simplified approach
     
     # Calculate portfolio value
-    total_value = sum(position['shares'] * position['currentPrice'] for position in positions)
+    total_value = float(position_arrays.values.sum())
     
     # Assume a daily volatility (standard deviation) of 1.5%
     daily_volatility = 0.015
@@ -731,19 +961,25 @@ def calculate_value_at_risk(positions):
         "percentageOfPortfolio": daily_var / total_value * 100
     }
 
-def generate_mock_benchmark_data(benchmark, start_date, end_date):
-    """Generate mock performance data for a benchmark"""
-    # In a real implementation, you would fetch historical price data for the benchmark
-    
+def _mock_benchmark_series(benchmark, start_date, end_date, dates=None):
+    """Generate mock benchmark values as a PerformanceSeries"""
     # Calculate number of days
     days = (end_date - start_date).days
     
     # Generate dates
-    dates = [(start_date + timedelta(days=i)).strftime('%Y-%m-%d') for i in range(days + 1)]
+    if dates is None:
+        dates = _date_strings(start_date, days + 1)
+    
+    return PerformanceSeries(dates, _mock_benchmark_values(benchmark, days))
+
+@lru_cache(maxsize=32)
+def _mock_benchmark_values(benchmark, days):
+    """Generate mock benchmark values for a period of days (memoized across warm invocations)"""
+    # In a real implementation, you would fetch historical price data for the benchmark
     
     # Different benchmarks will have different performances
     benchmark_value = sum(ord(c) for c in benchmark)
-    np.random.seed(benchmark_value)
+    rng = np.random.default_rng(benchmark_value)
     
     # Base value (arbitrary starting point)
     base_value = 10000
@@ -758,218 +994,114 @@ def generate_mock_benchmark_data(benchmark, start_date, end_date):
     else:
         trend_factor = np.linspace(0, 0.10, days + 1)  # 10% default trend
     
-    random_factor = np.random.normal(0, 0.008, days + 1)  # Daily random fluctuations
+    random_factor = rng.normal(0, 0.008, days + 1)  # Daily random fluctuations
     
-    daily_values = [base_value * (1 + trend + random) for trend, random in zip(trend_factor, random_factor)]
+    daily_values = base_value * (1.0 + trend_factor + random_factor)
     
-    # Combine dates and values
-    benchmark_data = [{"date": date, "value": value} for date, value in zip(dates, daily_values)]
+    # The cached array is shared between callers, so guard it against mutation
+    daily_values.setflags(write=False)
     
-    return benchmark_data
+    return daily_values
 
-def calculate_period_return(performance_data):
-    """Calculate total return over a period"""
-    first_value = performance_data[0]['value']
-    last_value = performance_data[-1]['value']
-    
-    return ((last_value / first_value) - 1) * 100  # Return as percentage
+def _period_return_arr(values):
+    """Total return over the last axis of a value array, as a percentage"""
+    # A 2D array of series (one per row) yields one return per row
+    return (values[..., -1] / values[..., 0] - 1.0) * 100.0
 
-def calculate_tracking_error(portfolio_data, benchmark_data):
-    """Calculate tracking error against benchmark"""
-    # Extract values
-    portfolio_values = [point['value'] for point in portfolio_data]
-    benchmark_values = [point['value'] for point in benchmark_data]
-    
-    # Calculate daily returns
-    portfolio_returns = [(portfolio_values[i] / portfolio_values[i-1]) - 1 for i in range(1, len(portfolio_values))]
-    benchmark_returns = [(benchmark_values[i] / benchmark_values[i-1]) - 1 for i in range(1, len(benchmark_values))]
+def _tracking_error_np(portfolio_values, benchmark_values):
+    """Annualized tracking error between two value arrays, as a percentage"""
+    # Align on the shorter of the two series
+    count = min(len(portfolio_values), len(benchmark_values))
     
-    # Calculate return differences
-    return_diff = [p - b for p, b in zip(portfolio_returns, benchmark_returns)]
+    # Daily log-return differences; for daily moves log(1 + r) ~= r, so the
+    # spread's standard deviation differs negligibly from simple returns
+    return_diff = np.diff(np.log(portfolio_values[:count])) - np.diff(np.log(benchmark_values[:count]))
     
     # Tracking error is the standard deviation of return differences, annualized
-    tracking_error = np.std(return_diff) * np.sqrt(252) * 100  # Convert to percentage
-    
-    return tracking_error
+    return float(return_diff.std()) * np.sqrt(252) * 100  # Convert to percentage
 
-def calculate_information_ratio(portfolio_data, benchmark_data):
-    """Calculate information ratio (excess return / tracking error)"""
-    # Calculate total returns
-    portfolio_return = calculate_period_return(portfolio_data)
-    benchmark_return = calculate_period_return(benchmark_data)
-    
-    # Calculate tracking error
-    tracking_error = calculate_tracking_error(portfolio_data, benchmark_data)
-    
+def _information_ratio(excess_return, tracking_error):
+    """Information ratio from an excess return and a tracking error"""
     # Avoid division by zero
     if tracking_error == 0:
         return 0
     
-    # Information ratio is excess return divided by tracking error
-    return (portfolio_return - benchmark_return) / tracking_error
+    return excess_return / tracking_error
 
-def analyze_sector_allocation(positions, total_value):
-    """Analyze sector allocation of portfolio"""
-    # In a real implementation, you would look up the sector for each ticker
-    # For this demo, we'll use mock sector data
-    
-    # Mock sector mapping
-    sector_mapping = {
-        'AAPL': 'Technology',
-        'MSFT': 'Technology',
-        'GOOGL': 'Technology',
-        'AMZN': 'Consumer Cyclical',
-        'FB': 'Technology',
-        'TSLA': 'Automotive',
-        'JPM': 'Financial Services',
-        'V': 'Financial Services',
-        'JNJ': 'Healthcare',
-        'WMT': 'Consumer Defensive',
-        'PG': 'Consumer Defensive',
-        'XOM': 'Energy',
-        'BAC': 'Financial Services',
-        'HD': 'Consumer Cyclical',
-        'INTC': 'Technology',
-        'VZ': 'Communication Services',
-        'T': 'Communication Services',
-        'NFLX': 'Communication Services',
-        'CSCO': 'Technology',
-        'PFE': 'Healthcare'
-    }
-    
-    # Default sector for unknown tickers
-    default_sector = 'Other'
-    
-    # Calculate value by sector
-    sector_values = {}
-    for position in positions:
-        ticker = position['ticker']
-        position_value = position['shares'] * position['currentPrice']
-        sector = sector_mapping.get(ticker, default_sector)
-        
-        if sector in sector_values:
-            sector_values[sector] += position_value
-        else:
-            sector_values[sector] = position_value
+def calculate_period_return(series):
+    """Calculate total return over a period"""
+    return float(_period_return_arr(np.asarray(series.values)))
+
+def calculate_tracking_error(portfolio_series, benchmark_series):
+    """Calculate tracking error against benchmark"""
+    return _tracking_error_np(portfolio_series.values, benchmark_series.values)
+
+def _category_allocation(position_codes, position_values, total_value, names, label):
+    """Sum position values per category code and express each category as a share of the portfolio"""
+    # Reduce values per category in one pass; skip categories with no value in the portfolio
+    category_values = np.bincount(position_codes, weights=position_values, minlength=len(names))
     
     # Calculate percentages
-    sector_allocation = [
+    allocation = [
         {
-            'sector': sector,
-            'value': value,
-            'percentage': (value / total_value) * 100
+            label: names[code],
+            'value': float(category_values[code]),
+            'percentage': (float(category_values[code]) / total_value) * 100
         }
-        for sector, value in sector_values.items()
+        for code in np.flatnonzero(category_values)
     ]
     
     # Sort by percentage (descending)
-    sector_allocation.sort(key=lambda x: x['percentage'], reverse=True)
+    allocation.sort(key=itemgetter('percentage'), reverse=True)
     
-    return sector_allocation
+    return allocation
 
-def analyze_asset_class_allocation(positions, total_value):
+def analyze_sector_allocation(position_arrays, total_value):
+    """Analyze sector allocation of portfolio"""
+    return _category_allocation(
+        position_arrays.sector_codes, position_arrays.values, total_value, SECTOR_NAMES, 'sector'
+    )
+
+def analyze_asset_class_allocation(position_arrays, total_value):
     """Analyze asset class allocation of portfolio"""
-    # In a real implementation, you would look up the asset class for each ticker
-    # For this demo, we'll use mock asset class data
-    
-    # Mock asset class mapping
-    asset_class_mapping = {
-        'AAPL': 'Stocks',
-        'MSFT': 'Stocks',
-        'GOOGL': 'Stocks',
-        'AMZN': 'Stocks',
-        'FB': 'Stocks',
-        'TSLA': 'Stocks',
-        'JPM': 'Stocks',
-        'V': 'Stocks',
-        'JNJ': 'Stocks',
-        'WMT': 'Stocks',
-        'PG': 'Stocks',
-        'XOM': 'Stocks',
-        'BAC': 'Stocks',
-        'HD': 'Stocks',
-        'INTC': 'Stocks',
-        'VZ': 'Stocks',
-        'T': 'Stocks',
-        'NFLX': 'Stocks',
-        'CSCO': 'Stocks',
-        'PFE': 'Stocks',
-        'AGG': 'Bonds',
-        'BND': 'Bonds',
-        'LQD': 'Bonds',
-        'TLT': 'Bonds',
-        'SHY': 'Bonds',
-        'GLD': 'Commodities',
-        'SLV': 'Commodities',
-        'VNQ': 'Real Estate'
-    }
-    
-    # Default asset class for unknown tickers
-    default_asset_class = 'Other'
-    
-    # Calculate value by asset class
-    asset_class_values = {}
-    for position in positions:
-        ticker = position['ticker']
-        position_value = position['shares'] * position['currentPrice']
-        asset_class = asset_class_mapping.get(ticker, default_asset_class)
-        
-        if asset_class in asset_class_values:
-            asset_class_values[asset_class] += position_value
-        else:
-            asset_class_values[asset_class] = position_value
+    return _category_allocation(
+        position_arrays.asset_class_codes, position_arrays.values, total_value, ASSET_CLASS_NAMES, 'assetClass'
+    )
+
+def _concentration_metrics(position_values, total_value):
+    """Top-1/3/5 holding percentages and HHI from position values"""
+    # Work on raw fractions of the portfolio; only the outputs are scaled
+    fractions = position_values / total_value
     
-    # Calculate percentages
-    asset_class_allocation = [
-        {
-            'assetClass': asset_class,
-            'value': value,
-            'percentage': (value / total_value) * 100
-        }
-        for asset_class, value in asset_class_values.items()
-    ]
+    # HHI is the sum of squared fractions (H = sum(p_i^2)), scaled to 0-10000
+    hhi = float(fractions @ fractions)
     
-    # Sort by percentage (descending)
-    asset_class_allocation.sort(key=lambda x: x['percentage'], reverse=True)
+    # Largest holdings first
+    ordered = np.sort(fractions)[::-1]
+    top_1 = float(ordered[:1].sum())
+    top_3 = float(ordered[:3].sum())
+    top_5 = float(ordered[:5].sum())
     
-    return asset_class_allocation
+    return top_1 * 100, top_3 * 100, top_5 * 100, hhi * 10000
 
-def calculate_concentration(positions, total_value):
+def calculate_concentration(position_arrays, total_value):
     """Calculate portfolio concentration metrics"""
-    # Calculate percentage of each position
-    position_percentages = [
-        (position['shares'] * position['currentPrice'] / total_value) * 100
-        for position in positions
-    ]
-    
-    # Sort percentages in descending order
-    position_percentages.sort(reverse=True)
-    
-    # Calculate concentration metrics
-    top_holding_percentage = position_percentages[0] if position_percentages else 0
-    top_3_percentage = sum(position_percentages[:3]) if len(position_percentages) >= 3 else sum(position_percentages)
-    top_5_percentage = sum(position_percentages[:5]) if len(position_percentages) >= 5 else sum(position_percentages)
-    
-    # Calculate Herfindahl-Hirschman Index (HHI) - a measure of concentration
-    hhi = sum([(p / 100) ** 2 for p in position_percentages]) * 10000
+    # Calculate concentration metrics, including the Herfindahl-Hirschman Index (HHI)
+    top_holding_percentage, top_3_percentage, top_5_percentage, hhi = _concentration_metrics(
+        position_arrays.values, float(total_value)
+    )
     
     return {
         'topHolding': top_holding_percentage,
         'top3Holdings': top_3_percentage,
         'top5Holdings': top_5_percentage,
         'hhi': hhi,
-        'numberOfPositions': len(positions)
+        'numberOfPositions': len(position_arrays.tickers)
     }
 
 def create_response(status_code, body):
     return {
         'statusCode': status_code,
-        'headers': {
-            'Content-Type': 'application/json',
-            'Access-Control-Allow-Origin': '*',
-            'Access-Control-Allow-Headers': 'Content-Type,X-Amz-Date,Authorization,X-Api-Key,X-Amz-Security-Token',
-            'Access-Control-Allow-Methods': 'GET,OPTIONS',
-            'Access-Control-Allow-Credentials': 'true'
-        },
-        'body': json.dumps(body, default=decimal_default)
+        'headers': JSON_RESPONSE_HEADERS,
+        'body': _dumps(body)
     }
\ No newline at end of file